@@ -1,10 +1,64 @@
 import numpy as np
-from random import random
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba est optionnel : on retombe alors sur la version NumPy
+    NUMBA_AVAILABLE = False
+
+# Résolution des tirages : entiers uniformes sur 16 bits, comparés à seuil = round(P(flip) * 65536)
+# (ramené dans [1, 65535] si 0 < p < 1 : sinon tout p < 2^-17 ~ 7.6e-6 donnerait 0 et un état absorbant)
+RAND_RESOLUTION = 1 << 16
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True, boundscheck=False, nogil=True)
+    def _sweep_color(source, other, flip_table, rand, priv_multiplier, row_up, row_dn, hcols):
+        """
+        Met à jour (version compilée) tous les spins de 'source' en se basant sur 'other'.
+        :param flip_table: matrice 2x5 des seuils de flip mise à plat (indice 5 * spin_bit + up_count)
+        :param rand: un tirage entier uniforme sur 16 bits par spin de 'source'
+        :param priv_multiplier: facteur du seuil de flip de chaque agent de 'source'
+                                (privileged_flip_factor pour les privilégiés, 1 sinon)
+        :param row_up, row_dn, hcols: tables précalculées des voisins haut, bas et horizontal
+        :return: somme des nouveaux spins de 'source'
+        """
+        grid_height, grid_width = source.shape
+        # copie locale de la table (40 octets) : en cache L1 avant la boucle principale
+        flip_table = flip_table.copy()
+        market = 0
+        for row in prange(grid_height):
+            upper_neighbor_row = row_up[row]
+            lower_neighbor_row = row_dn[row]
+
+            for col in range(grid_width):
+                # bit du spin (0 => -1, 1 => +1) et nombre de voisins "up" (0..4)
+                spin_bit = (source[row, col] + 1) >> 1
+                up_count = (
+                    other[upper_neighbor_row, col]
+                    + other[lower_neighbor_row, col]
+                    + other[row, col]
+                    + other[row, hcols[row, col]]
+                    + 4
+                ) >> 1
+
+                # seuil de flip, multiplié pour les agents privilégiés (cap à 65536, i.e. p = 1)
+                threshold = min(flip_table[5 * spin_bit + up_count] * priv_multiplier[row, col],
+                                RAND_RESOLUTION)
+
+                # Décision de flip sans branchement
+                new_spin = 2 * (rand[row, col] < threshold) - 1
+                source[row, col] = new_spin
+                market += new_spin
+        return market
+
 
 class SpinSystem:
     """
     Classe représentant un système de spins avec mise à jour en damier (checkerboard).
     Inclut un sous-groupe d'agents privilégiés réagissant différemment.
+    Les spins sont stockés en SoA dans des tableaux int8 de forme (H, W//2), séparés en
+    sous-grilles black/white selon la décomposition en damier de Preis et al.
     """
 
     def __init__(
@@ -13,7 +67,8 @@ class SpinSystem:
         grid_width: int,
         init_up: float = 0.5,
         privileged_fraction: float = 0.1,
-        privileged_flip_factor: float = 1.5
+        privileged_flip_factor: float = 1.5,
+        seed: int = None
     ):
         """
         :param grid_height: Nombre de lignes de la grille (height).
@@ -23,6 +78,8 @@ class SpinSystem:
         :param privileged_fraction: Fraction d'agents privilégiés (0 <= f <= 1).
         :param privileged_flip_factor: Facteur de multiplication de la proba
                                        de flip pour les agents privilégiés.
+        :param seed: Graine du générateur aléatoire (par défaut tirée du générateur
+                     global de NumPy, pour que np.random.seed(...) reste reproductible).
         """
         self.grid_height = grid_height
         self.grid_width = grid_width
@@ -30,6 +87,11 @@ class SpinSystem:
         self.privileged_fraction = privileged_fraction
         self.privileged_flip_factor = privileged_flip_factor
 
+        # Générateur aléatoire (PCG64)
+        if seed is None:
+            seed = np.random.randint(2**31)
+        self._rng = np.random.default_rng(seed)
+
         # Taille des sous-grilles "black" et "white"
         color_shape = (grid_height, grid_width // 2)
 
@@ -37,29 +99,69 @@ class SpinSystem:
         self.black = np.ones(color_shape, dtype=np.byte)
         self.white = np.ones(color_shape, dtype=np.byte)
 
+        # Tampons de la version NumPy du sweep (somme des voisins en int8, seuils de flip
+        # en float32 car multipliés par le facteur des agents privilégiés, masque et int8
+        # intermédiaires), réutilisés d'un sweep à l'autre
+        self._nsum = np.empty(color_shape, dtype=np.int8)
+        self._thresholds_buf = np.empty(color_shape, dtype=np.float32)
+        self._mask_buf = np.empty(color_shape, dtype=bool)
+        self._int8_buf = np.empty(color_shape, dtype=np.int8)
+
         # Masques booléens pour identifier les agents privilégiés
         self.black_privileged = np.zeros(color_shape, dtype=bool)
         self.white_privileged = np.zeros(color_shape, dtype=bool)
 
+        # Colonnes du voisin horizontal pour chaque case :
+        # black => droite si row est pair, gauche sinon ; white => inverse
+        cols = np.arange(grid_width // 2, dtype=np.int32)
+        right_cols = np.roll(cols, -1)
+        left_cols = np.roll(cols, 1)
+        odd_rows = (np.arange(grid_height) % 2 == 1)[:, None]
+        self._hcols_black = np.where(odd_rows, left_cols, right_cols)
+        self._hcols_white = np.where(odd_rows, right_cols, left_cols)
+
+        # Lignes voisines haut/bas (bords périodiques)
+        rows = np.arange(grid_height, dtype=np.int32)
+        self._row_up = np.roll(rows, 1)
+        self._row_dn = np.roll(rows, -1)
+
+        # Cache des tables de seuils de flip, indexé par |global_market| (au plus N + 1 entrées),
+        # valable pour le couple (J, alpha) de _prob_cache_couplings et vidé quand il change
+        self._prob_cache = {}
+        self._prob_cache_couplings = None
+
         # Initialisation aléatoire des spins
         self._init_spins()
 
+        # Magnétisation globale (somme des spins) : calculée une fois ici, puis tenue à jour
+        # par les sweeps qui renvoient la somme de leur couleur
+        self._global_market = int(self.black.sum(dtype=np.int64) + self.white.sum(dtype=np.int64))
+
         # Sélection aléatoire des agents privilégiés
         self._init_privileged_agents()
 
+        # Facteur multiplicatif de la proba de flip de chaque agent
+        # (privileged_flip_factor pour les privilégiés, 1 sinon), calculé une fois pour toutes
+        self._priv_multiplier_black = np.where(
+            self.black_privileged, self.privileged_flip_factor, 1.0
+        ).astype(np.float32)
+        self._priv_multiplier_white = np.where(
+            self.white_privileged, self.privileged_flip_factor, 1.0
+        ).astype(np.float32)
+
+        # Les sweeps parcourent les lignes avec un pas de 1 : tableaux C-contigus obligatoires
+        for arr in (self.black, self.white, self._hcols_black, self._hcols_white,
+                    self._priv_multiplier_black, self._priv_multiplier_white):
+            assert arr.flags['C_CONTIGUOUS']
+
     def _init_spins(self):
         """
         Initialise aléatoirement les spins dans black et white :
         +1 = spin "up", -1 = spin "down".
         """
         for color_arr in (self.black, self.white):
-            rows, cols = color_arr.shape
-            for row in range(rows):
-                for col in range(cols):
-                    if random() < self.init_up:
-                        color_arr[row, col] = -1  # "down"
-                    else:
-                        color_arr[row, col] = +1  # "up"
+            # -1 ("down") si le tirage est < init_up, +1 ("up") sinon
+            color_arr[:] = np.where(self._rng.random(color_arr.shape) < self.init_up, -1, 1)
 
     def _init_privileged_agents(self):
         """
@@ -70,14 +172,14 @@ class SpinSystem:
         rows_b, cols_b = self.black_privileged.shape
         nb_agents_black = rows_b * cols_b
         nb_priv_black = int(nb_agents_black * self.privileged_fraction)
-        indices_black = np.random.choice(nb_agents_black, size=nb_priv_black, replace=False)
+        indices_black = self._rng.choice(nb_agents_black, size=nb_priv_black, replace=False, shuffle=False)
         self.black_privileged.ravel()[indices_black] = True
 
         # white
         rows_w, cols_w = self.white_privileged.shape
         nb_agents_white = rows_w * cols_w
         nb_priv_white = int(nb_agents_white * self.privileged_fraction)
-        indices_white = np.random.choice(nb_agents_white, size=nb_priv_white, replace=False)
+        indices_white = self._rng.choice(nb_agents_white, size=nb_priv_white, replace=False, shuffle=False)
         self.white_privileged.ravel()[indices_white] = True
 
     def precompute_probabilities(self, reduced_neighbor_coupling: float, market_coupling: float) -> np.ndarray:
@@ -90,58 +192,63 @@ class SpinSystem:
         :param market_coupling: (reduced_alpha * abs(M) / number_of_traders)
         :return: un tableau (2,5) de probabilités
         """
-        probabilities = np.empty((2, 5), dtype=float)
-        for row in range(2):
-            spin = 1 if row == 1 else -1
-            for col in range(5):
-                neighbour_sum = -4 + 2 * col  # -4, -2, 0, +2, +4
-                field = (reduced_neighbor_coupling * neighbour_sum) - (market_coupling * spin)
-                # Règle de Heatbath : P(flip) = 1 / (1 + exp(field))
-                prob_flip = 1 / (1 + np.exp(field))
-                probabilities[row, col] = prob_flip
-
+        spins = np.array([-1, 1])
+        neighbour_sums = np.arange(-4, 5, 2)  # -4, -2, 0, +2, +4
+        field = (reduced_neighbor_coupling * neighbour_sums[None, :]) - (market_coupling * spins[:, None])
+        # Règle de Heatbath : P(flip) = 1 / (1 + exp(field)) = 0.5 * (1 - tanh(field / 2)),
+        # forme stable quand |field| est grand (pas de débordement de exp)
+        probabilities = 0.5 * (1 - np.tanh(0.5 * field))
         return probabilities
 
-    def _compute_neighbour_sum(self, is_black: bool, source: np.ndarray, row: int, col: int) -> int:
+    def precompute_thresholds(self, reduced_neighbor_coupling: float, market_coupling: float) -> np.ndarray:
         """
-        Calcule la somme des spins voisins en mode damier (4 voisins):
+        Convertit les probabilités de flip en seuils entiers : un spin passe à +1 si son
+        tirage (entier uniforme sur 16 bits) est < seuil, soit P(flip) = seuil / 65536.
+
+        :param reduced_neighbor_coupling: (-2 * beta * j)
+        :param market_coupling: (reduced_alpha * abs(M) / number_of_traders)
+        :return: un tableau (2,5) de seuils en uint32 (p = 1 => seuil 65536)
+        """
+        probabilities = self.precompute_probabilities(reduced_neighbor_coupling, market_coupling)
+        thresholds = np.maximum(np.rint(probabilities * RAND_RESOLUTION), probabilities > 0)
+        np.minimum(thresholds, RAND_RESOLUTION - (probabilities < 1), out=thresholds)
+        return thresholds.astype(np.uint32)
+
+    def _compute_neighbour_sum(self, is_black: bool, source: np.ndarray) -> np.ndarray:
+        """
+        Calcule la somme des spins voisins en mode damier (4 voisins),
+        pour toutes les cases de la sous-grille à la fois :
         - haut, bas, soi-même, horizontal
         :param is_black: indique si on traite la sous-grille black ou white
         :param source: l'autre sous-grille servant de voisins
-        :param row, col: position dans la sous-grille
-        :return: somme entière des spins
+        :return: tableau des sommes de spins (tampon self._nsum, même forme que source)
         """
-        grid_height, grid_width = source.shape
+        neighbour_sum = self._nsum
+
+        # haut/bas : vues décalées pour l'intérieur, lignes de bord lues dans row_up/row_dn
+        np.add(source[:-2], source[2:], out=neighbour_sum[1:-1])
+        np.add(source[self._row_up[0]], source[self._row_dn[0]], out=neighbour_sum[0])
+        np.add(source[self._row_up[-1]], source[self._row_dn[-1]], out=neighbour_sum[-1])
+
+        # soi-même
+        neighbour_sum += source
 
-        # bords périodiques (haut/bas)
-        lower_neighbor_row = (row + 1) if ((row + 1) < grid_height) else 0
-        upper_neighbor_row = (row - 1)
-
-        # bords périodiques (gauche/droite)
-        right_neighbor_col = (col + 1) if ((col + 1) < grid_width) else 0
-        left_neighbor_col = (col - 1)
-
-        if is_black:
-            # si row est pair => droite, sinon gauche
-            horizontal_neighbor_col = left_neighbor_col if (row % 2) else right_neighbor_col
-        else:
-            # inverse
-            horizontal_neighbor_col = right_neighbor_col if (row % 2) else left_neighbor_col
-
-        neighbour_sum = (
-            source[upper_neighbor_row, col]
-            + source[lower_neighbor_row, col]
-            + source[row, col]
-            + source[row, horizontal_neighbor_col]
-        )
-        return int(neighbour_sum)
+        # voisin horizontal : vues décalées d'une colonne, une ligne sur deux (pas de gather)
+        # black => droite si row est pair, gauche sinon ; white => inverse
+        right_rows, left_rows = (slice(0, None, 2), slice(1, None, 2)) if is_black \
+            else (slice(1, None, 2), slice(0, None, 2))
+        neighbour_sum[right_rows, :-1] += source[right_rows, 1:]
+        neighbour_sum[right_rows, -1] += source[right_rows, 0]
+        neighbour_sum[left_rows, 1:] += source[left_rows, :-1]
+        neighbour_sum[left_rows, 0] += source[left_rows, -1]
+        return neighbour_sum
 
     def _update_subgrid(
         self,
         is_black: bool,
         source: np.ndarray,
         checkerboard_agents: np.ndarray,
-        probabilities: np.ndarray,
+        thresholds: np.ndarray,
         global_market: int
     ):
         """
@@ -149,37 +256,46 @@ class SpinSystem:
         :param is_black: True si on met à jour black, False si on met à jour white
         :param source: la sous-grille en cours de mise à jour (self.black ou self.white)
         :param checkerboard_agents: l'autre sous-grille (white ou black)
-        :param probabilities: matrice 2x5 de proba calculée par precompute_probabilities
+        :param thresholds: matrice 2x5 des seuils de flip calculée par precompute_thresholds
         :param global_market: somme totale des spins (black + white)
+        :return: somme des nouveaux spins de 'source'
         """
-        grid_height, grid_width = source.shape
-
-        # masque booléen des agents privilégiés (black ou white)
-        privileged_mask = self.black_privileged if is_black else self.white_privileged
+        # facteur de la proba de flip des agents (privilégiés ou non) de black ou white
+        priv_multiplier = self._priv_multiplier_black if is_black else self._priv_multiplier_white
 
-        for row in range(grid_height):
-            for col in range(grid_width):
-                neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents, row, col)
-                # spin_idx: 0 => -1, 1 => +1
-                current_spin = source[row, col]
-                spin_idx = 1 if current_spin == +1 else 0
+        # un entier uniforme sur 16 bits par spin (mots bruts de 64 bits découpés en 4)
+        n_spins = source.size
+        rand = self._rng.bit_generator.random_raw((n_spins + 3) // 4).view(np.uint16)[:n_spins]
+        rand = rand.reshape(source.shape)
 
-                sum_idx = int((neighbour_sum + 4) / 2)
+        if NUMBA_AVAILABLE:
+            horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+            return _sweep_color(
+                source, checkerboard_agents, thresholds.ravel(), rand,
+                priv_multiplier, self._row_up, self._row_dn, horizontal_neighbor_cols
+            )
 
-                base_prob = probabilities[spin_idx, sum_idx]
+        neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents)
+        # index dans la table à plat 5 * spin_bit + sum_idx (spin_bit: 0 => -1, 1 => +1),
+        # calculé en place dans le tampon int8
+        flat_idx = neighbour_sum
+        flat_idx += 4
+        flat_idx >>= 1
+        spin_bit = np.greater(source, 0, out=self._mask_buf).view(np.int8)
+        flat_idx += np.multiply(spin_bit, 5, out=self._int8_buf)
 
-                # Si l'agent est privilégié, on multiplie la prob de flip par privileged_flip_factor
-                if privileged_mask[row, col]:
-                    prob = base_prob * self.privileged_flip_factor
-                    prob = min(prob, 1.0)  # cap à 1
-                else:
-                    prob = base_prob
+        # Pour les agents privilégiés, le seuil de flip est multiplié par privileged_flip_factor
+        # (cap à 65536, i.e. p = 1)
+        flip_thresholds = np.take(thresholds.ravel().astype(np.float32), flat_idx, out=self._thresholds_buf)
+        flip_thresholds *= priv_multiplier
+        np.minimum(flip_thresholds, RAND_RESOLUTION, out=flip_thresholds)
 
-                # Décision de flip
-                if random() < prob:
-                    source[row, col] = +1
-                else:
-                    source[row, col] = -1
+        # Décision de flip : spins écrits en place en int8 (2 * up - 1),
+        # somme déduite du nombre de +1
+        flips_up = np.less(rand, flip_thresholds, out=self._mask_buf)
+        np.multiply(flips_up.view(np.int8), 2, out=source)
+        source -= 1
+        return 2 * int(np.count_nonzero(flips_up)) - source.size
 
     def update(self, reduced_neighbour_coupling: float, reduced_alpha: float) -> float:
         """
@@ -192,19 +308,29 @@ class SpinSystem:
         # 1) Calcul du nombre total de spins
         number_of_traders = 2 * self.black.shape[0] * self.black.shape[1]
 
-        # 2) Calcul de la magnétisation globale
-        global_market = np.sum(self.black + self.white)
-
-        # 3) Calcul de l'effet du marché (market_coupling)
-        market_coupling = reduced_alpha * np.abs(global_market) / number_of_traders
+        # 2) Magnétisation globale, tenue à jour par les sweeps (aucune réduction sur la grille)
+        global_market = self._global_market
 
-        # 4) Pré-calcul des probabilités de flip
-        probabilities = self.precompute_probabilities(reduced_neighbour_coupling, market_coupling)
+        # 3) Seuils de flip, en cache par |global_market| : c'est un entier borné, la table
+        #    n'est donc calculée qu'une fois par valeur ; le cache est vidé quand (J, alpha) change
+        couplings = (float(reduced_neighbour_coupling), float(reduced_alpha))
+        if couplings != self._prob_cache_couplings:
+            self._prob_cache.clear()
+            self._prob_cache_couplings = couplings
+        key = abs(global_market)
+        thresholds = self._prob_cache.get(key)
+        if thresholds is None:
+            # 4) Calcul de l'effet du marché (market_coupling) et des seuils de flip
+            market_coupling = reduced_alpha * np.abs(global_market) / number_of_traders
+            thresholds = self.precompute_thresholds(reduced_neighbour_coupling, market_coupling)
+            thresholds.flags.writeable = False  # table partagée entre les sweeps
+            self._prob_cache[key] = thresholds
 
         # 5) Mise à jour de la sous-grille black
-        self._update_subgrid(True, self.black, self.white, probabilities, global_market)
+        black_market = self._update_subgrid(True, self.black, self.white, thresholds, global_market)
         # 6) Mise à jour de la sous-grille white
-        self._update_subgrid(False, self.white, self.black, probabilities, global_market)
+        white_market = self._update_subgrid(False, self.white, self.black, thresholds, global_market)
+        self._global_market = black_market + white_market
 
         # 7) Retourne la magnétisation relative
         return global_market / number_of_traders
@@ -5,73 +5,79 @@ class SpinSystem:
     """
     Classe représentant un système de spins avec mise à jour en damier (checkerboard).
     Contient une methode induce_local_crash qui force un groupe d'agents à vendre (krach boursier)
+    Les spins sont stockés en SoA dans des tableaux int8 de forme (H, W//2), séparés en
+    sous-grilles black/white selon la décomposition en damier de Preis et al.
     """
 
-    def __init__(self, grid_height, grid_width, init_up=0.5):
+    def __init__(self, grid_height, grid_width, init_up=0.5, seed=None):
         self.grid_height = grid_height
         self.grid_width = grid_width
         self.init_up = init_up
 
+        # générateur aléatoire (PCG64) ; graine tirée du générateur global de NumPy par défaut,
+        # pour que np.random.seed(...) garde la simulation reproductible
+        if seed is None:
+            seed = np.random.randint(2**31)
+        self._rng = np.random.default_rng(seed)
+
         color_shape = (grid_height, grid_width // 2)
         self.black = np.ones(color_shape, dtype=np.byte)
         self.white = np.ones(color_shape, dtype=np.byte)
+
+        # tables des voisins, calculées une fois pour toutes (bords périodiques) :
+        # lignes du haut/bas, et colonne du voisin horizontal de chaque case
+        # (black => droite sur les lignes paires, gauche sur les impaires ; white => l'inverse)
+        rows = np.arange(grid_height, dtype=np.int32)
+        self._row_up = np.roll(rows, 1)
+        self._row_dn = np.roll(rows, -1)
+        cols = np.arange(grid_width // 2, dtype=np.int32)
+        right_cols = np.roll(cols, -1)
+        left_cols = np.roll(cols, 1)
+        odd_rows = (rows % 2 == 1)[:, None]
+        self._hcols_black = np.where(odd_rows, left_cols, right_cols)
+        self._hcols_white = np.where(odd_rows, right_cols, left_cols)
+
         self._init_spins()
 
     def _init_spins(self):
         for color_arr in (self.black, self.white):
-            rows, cols = color_arr.shape
-            for row in range(rows):
-                for col in range(cols):
-                    if random() < self.init_up:
-                        color_arr[row, col] = -1
-                    else:
-                        color_arr[row, col] = +1
+            # un tirage par spin : -1 s'il est < init_up, +1 sinon (2 * up - 1, en place en int8)
+            up = self._rng.random(color_arr.shape) >= self.init_up
+            np.multiply(up.view(np.int8), 2, out=color_arr)
+            color_arr -= 1
 
     def precompute_probabilities(self, reduced_neighbor_coupling, market_coupling):
-        probabilities = np.empty((2, 5), dtype=float)
-        for row in range(2):
-            spin = +1 if row == 1 else -1
-            for col in range(5):
-                neighbour_sum = -4 + 2 * col
-                field = reduced_neighbor_coupling * neighbour_sum - market_coupling * spin
-                probabilities[row, col] = 1 / (1 + np.exp(field))
+        spins = np.array([-1.0, 1.0])[:, None]
+        neighbour_sums = np.arange(-4, 5, 2, dtype=float)[None, :]
+        field = reduced_neighbor_coupling * neighbour_sums - market_coupling * spins
+        probabilities = 1 / (1 + np.exp(field))
         return probabilities
 
-    def _compute_neighbour_sum(self, is_black, source, row, col):
-        grid_height, grid_width = source.shape
-        lower_neighbor_row = row + 1 if (row + 1 < grid_height) else 0
-        upper_neighbor_row = row - 1
-        right_neighbor_col = col + 1 if (col + 1 < grid_width) else 0
-        left_neighbor_col = col - 1
-
-        if is_black:
-            horizontal_neighbor_col = left_neighbor_col if (row % 2) else right_neighbor_col
-        else:
-            horizontal_neighbor_col = right_neighbor_col if (row % 2) else left_neighbor_col
-
-        neighbour_sum = (
-            source[upper_neighbor_row, col]
-            + source[lower_neighbor_row, col]
-            + source[row, col]
-            + source[row, horizontal_neighbor_col]
-        )
-        return int(neighbour_sum)
-
     def _update_strategies(self, is_black, source, checkerboard_agents, probabilities):
         grid_height, grid_width = source.shape
+        horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+        probs_down, probs_up = probabilities[0].tolist(), probabilities[1].tolist()  # spin -1 / +1
         for row in range(grid_height):
+            # voisins de la ligne lus une fois, en listes Python
+            upper_row = checkerboard_agents[self._row_up[row]].tolist()
+            lower_row = checkerboard_agents[self._row_dn[row]].tolist()
+            same_row = checkerboard_agents[row].tolist()
+            hcols_row = horizontal_neighbor_cols[row].tolist()
+            spins_row = source[row].tolist()
             for col in range(grid_width):
-                neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents, row, col)
-                spin_idx = int((source[row, col] + 1) / 2)  # -1 -> 0, +1 -> 1
-                sum_idx = int((neighbour_sum + 4) / 2)
-                if random() < probabilities[spin_idx][sum_idx]:
-                    source[row, col] = +1
+                neighbour_sum = upper_row[col] + lower_row[col] + same_row[col] + same_row[hcols_row[col]]
+                sum_idx = (neighbour_sum + 4) >> 1
+                row_probs = probs_up if spins_row[col] == +1 else probs_down
+                if random() < row_probs[sum_idx]:
+                    spins_row[col] = +1
                 else:
-                    source[row, col] = -1
+                    spins_row[col] = -1
+            source[row] = spins_row
 
     def update(self, reduced_neighbour_coupling, reduced_alpha):
         number_of_traders = 2 * self.black.shape[0] * self.black.shape[1]
-        global_market = np.sum(self.black + self.white)
+        # une réduction par couleur, accumulée en int64 (pas de tableau temporaire black + white)
+        global_market = int(self.black.sum(dtype=np.int64) + self.white.sum(dtype=np.int64))
 
         market_coupling = reduced_alpha * abs(global_market) / number_of_traders
         probabilities = self.precompute_probabilities(reduced_neighbour_coupling, market_coupling)
@@ -91,26 +97,20 @@ class SpinSystem:
         
         :param fraction: Pourcentage d'agents dans la zone qui seront forcés à -1
         :param region: 
-           - "random": choisit des positions aléatoires sur la grille complète
+           - "random": chaque agent de la grille complète est forcé à -1 avec probabilité fraction
            - "top_left", "bottom_left", etc.
         """
         # black + white => on va manipuler le tableau complet
         # mais la portion est stockée en 2 sous-grilles
         rows_b, cols_b = self.black.shape
-        nb_agents_black = rows_b * cols_b
-        nb_change_black = int(nb_agents_black * fraction)
-
         rows_w, cols_w = self.white.shape
-        nb_agents_white = rows_w * cols_w
-        nb_change_white = int(nb_agents_white * fraction)
 
         if region == "random":
-            # Choix aléatoire de nb_change_black positions dans black
-            indices_b = np.random.choice(nb_agents_black, size=nb_change_black, replace=False)
-            self.black.ravel()[indices_b] = -1
+            # Chaque agent de black est forcé à -1 avec probabilité fraction
+            # (tirage de Bernoulli : en moyenne fraction * nb_agents, sans permutation)
+            self.black[self._rng.random(self.black.shape) < fraction] = -1
             # Idem pour white
-            indices_w = np.random.choice(nb_agents_white, size=nb_change_white, replace=False)
-            self.white.ravel()[indices_w] = -1
+            self.white[self._rng.random(self.white.shape) < fraction] = -1
 
         elif region == "top_left":
             # on cible la moitié supérieure et la moitié gauche
@@ -5,6 +5,8 @@ class SpinSystem:
     """
     Classe représentant un système de spins avec mise à jour en damier (checkerboard).
     Possibilité d'ajouter une zone d'agents neutres localisés.
+    Les spins sont stockés en SoA dans des tableaux int8 de forme (H, W//2), séparés en
+    sous-grilles black/white selon la décomposition en damier de Preis et al.
     """
 
     def __init__(self, grid_height, grid_width, init_up=0.5, fraction_neutral=0.2, region_neutral="random"):
@@ -27,6 +29,19 @@ class SpinSystem:
         self.black = np.ones(color_shape, dtype=np.int8)
         self.white = np.ones(color_shape, dtype=np.int8)
 
+        # tables des voisins, calculées une fois pour toutes (bords périodiques) :
+        # lignes du haut/bas, et colonne du voisin horizontal de chaque case
+        # (black => droite sur les lignes paires, gauche sur les impaires ; white => l'inverse)
+        rows = np.arange(grid_height, dtype=np.int32)
+        self._row_up = np.roll(rows, 1)
+        self._row_dn = np.roll(rows, -1)
+        cols = np.arange(grid_width // 2, dtype=np.int32)
+        right_cols = np.roll(cols, -1)
+        left_cols = np.roll(cols, 1)
+        odd_rows = (rows % 2 == 1)[:, None]
+        self._hcols_black = np.where(odd_rows, left_cols, right_cols)
+        self._hcols_white = np.where(odd_rows, right_cols, left_cols)
+
         self._init_spins()
 
 
@@ -69,12 +84,10 @@ class SpinSystem:
 
             full_grid.ravel()[selected_indices] = 0
 
-        # affectation des valeurs restantes à +1 ou -1
-        for i in range(self.grid_height):
-            for j in range(self.grid_width):
-                if full_grid[i, j] == 0:
-                    continue  # Déjà neutre
-                full_grid[i, j] = 1 if random() < self.init_up else -1
+        # affectation des valeurs restantes à +1 ou -1 : un tirage par case, +1 s'il est < init_up,
+        # -1 sinon (2 * up - 1), puis multiplié par full_grid pour garder les neutres à 0
+        up = np.random.random(full_grid.shape) < self.init_up
+        full_grid *= 2 * up.view(np.int8) - 1
 
         self.black[:, :] = full_grid[:, ::2]  
         self.white[:, :] = full_grid[:, 1::2] 
@@ -86,80 +99,58 @@ class SpinSystem:
         - 2 états initiaux du spin : (+1 ou -1)  
         - 5 sommes de voisins possibles : (-4, -2, 0, +2, +4)
         """
-        probabilities = np.empty((2, 5), dtype=float)
         # spin_idx: 0 => spin = -1, 1 => spin = +1
-        for spin_idx in [0, 1]:
-            spin_val = 1 if spin_idx == 1 else -1
-            for col in range(5):
-                neighbour_sum = -4 + 2 * col  # -4, -2, 0, +2, +4
-                field = reduced_neighbor_coupling * neighbour_sum \
-                        - market_coupling * spin_val  # Équation (4)
-                # Règle de Heatbath : P(flip) = 1 / (1 + exp(field))
-                probabilities[spin_idx, col] = 1.0 / (1.0 + np.exp(field))
+        spin_vals = np.array([-1.0, 1.0])[:, None]
+        neighbour_sums = np.arange(-4, 5, 2, dtype=float)[None, :]  # -4, -2, 0, +2, +4
+        field = reduced_neighbor_coupling * neighbour_sums \
+                - market_coupling * spin_vals  # Équation (4)
+        # Règle de Heatbath : P(flip) = 1 / (1 + exp(field)), un seul appel à np.exp sur la table 2x5
+        probabilities = 1.0 / (1.0 + np.exp(field))
         return probabilities
 
-    def _compute_neighbour_sum(self, is_black, source, row, col):
-        """
-        Calcule la somme des spins voisins. 
-        Les spins neutres (0) sont pris tels quels => s'ajoutent à la somme.
-        """
-        grid_height, grid_width = source.shape
-
-        # Voisin du bas (périodique)
-        lower_neighbor_row = (row + 1) if (row + 1 < grid_height) else 0
-        # Voisin du haut (périodique)
-        upper_neighbor_row = (row - 1) if (row - 1 >= 0) else (grid_height - 1)
-
-        # Voisins gauche/droite (périodiques)
-        right_neighbor_col = (col + 1) if (col + 1 < grid_width) else 0
-        left_neighbor_col  = (col - 1) if (col - 1 >= 0) else (grid_width - 1)
-
-        # Sélection du voisin horizontal selon la parité de la ligne
-        if is_black:
-            horizontal_neighbor_col = left_neighbor_col if (row % 2) else right_neighbor_col
-        else:
-            horizontal_neighbor_col = right_neighbor_col if (row % 2) else left_neighbor_col
-
-        # On additionne : le spin du haut + bas + lui-même + celui du voisin horizontal
-        neighbour_sum = (
-            source[upper_neighbor_row, col] +
-            source[lower_neighbor_row, col] +
-            source[row, col] +
-            source[row, horizontal_neighbor_col]
-        )
-        return int(neighbour_sum)
-
     def _update_strategies(self, is_black, source, checkerboard_agents, probabilities):
         """
         Met à jour chaque spin (-1/+1) en se référant à checkerboard_agents.
         Les spins neutres (0) ne changent jamais.
         """
         grid_height, grid_width = source.shape
+        horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+        # spin_idx = 0 si -1, 1 si +1 : on garde directement les deux lignes de la table
+        probs_down, probs_up = probabilities[0].tolist(), probabilities[1].tolist()
         for row in range(grid_height):
+            # lignes voisines (haut, bas, même ligne) et colonnes horizontales, lues une fois par ligne
+            upper_row = checkerboard_agents[self._row_up[row]].tolist()
+            lower_row = checkerboard_agents[self._row_dn[row]].tolist()
+            same_row = checkerboard_agents[row].tolist()
+            hcols_row = horizontal_neighbor_cols[row].tolist()
+            spins_row = source[row].tolist()
+
             for col in range(grid_width):
-                current_spin = source[row, col]
+                current_spin = spins_row[col]
                 # Spin neutre => on ignore
                 if current_spin == 0:
                     continue
 
-                neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents, row, col)
-                # spin_idx = 0 si -1, 1 si +1
-                spin_idx = 0 if current_spin == -1 else 1
+                # Les spins neutres (0) des voisins s'ajoutent tels quels à la somme
+                neighbour_sum = upper_row[col] + lower_row[col] + same_row[col] + same_row[hcols_row[col]]
                 # sum_idx = index pour (-4, -2, 0, +2, +4)
-                sum_idx = int((neighbour_sum + 4) / 2)
+                sum_idx = (neighbour_sum + 4) >> 1
+                row_probs = probs_down if current_spin == -1 else probs_up
 
                 # Décision de flip via probabilité
-                if random() < probabilities[spin_idx][sum_idx]:
-                    source[row, col] = +1
+                if random() < row_probs[sum_idx]:
+                    spins_row[col] = +1
                 else:
-                    source[row, col] = -1
+                    spins_row[col] = -1
+
+            source[row] = spins_row
 
     def update(self, reduced_neighbour_coupling, reduced_alpha):
         """
         Met à jour les spins en excluant les neutres.
         """
         number_of_traders = 2 * self.black.shape[0] * self.black.shape[1]
-        global_market = np.sum(self.black + self.white)
+        global_market = int(self.black.sum(dtype=np.int64) + self.white.sum(dtype=np.int64))
 
         market_coupling = reduced_alpha * abs(global_market) / number_of_traders
         probabilities = self.precompute_probabilities(reduced_neighbour_coupling, market_coupling)
@@ -1,15 +1,52 @@
 import numpy as np
-from random import random
-from source.old_py_files.trader import Trader
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba est optionnel : on garde alors la boucle Python
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True, boundscheck=False, nogil=True)
+    def _sweep(subgrid, other_subgrid, probabilities, rand, row_up, row_dn, hcols):
+        """
+        Met à jour (version compilée) tous les traders de 'subgrid' en se basant sur 'other_subgrid'.
+        :param probabilities: table 2x5 (copiée localement avant la boucle)
+        :param rand: un tirage uniforme par trader de 'subgrid'
+        :param row_up, row_dn, hcols: tables précalculées des voisins haut, bas et horizontal
+        """
+        grid_height, grid_width = subgrid.shape
+        probabilities = probabilities.copy()
+        # les lignes ne lisent que other_subgrid : elles sont indépendantes (prange)
+        for row in prange(grid_height):
+            upper_neighbor_row = row_up[row]
+            lower_neighbor_row = row_dn[row]
+
+            for col in range(grid_width):
+                neighbour_sum = (
+                    other_subgrid[upper_neighbor_row, col]
+                    + other_subgrid[lower_neighbor_row, col]
+                    + other_subgrid[row, col]
+                    + other_subgrid[row, hcols[row, col]]
+                )
+                spin_idx = (subgrid[row, col] + 1) >> 1
+                sum_idx = (neighbour_sum + 4) >> 1
+
+                subgrid[row, col] = 2 * (rand[row, col] < probabilities[spin_idx, sum_idx]) - 1
+
 
 class SpinSystem:
     """
-    Système gérant l'ensemble des traders (spin + position) sur une grille divisée en damier (black/white).
+    Système gérant l'ensemble des traders sur une grille divisée en damier (black/white).
+    Les spins sont stockés en SoA dans des tableaux int8 de forme (H, W//2), séparés en
+    sous-grilles black/white selon la décomposition en damier de Preis et al. ;
+    la position (row, col) d'un trader est simplement son indice dans le tableau.
     """
 
     def __init__(self, grid_height, grid_width, init_up=0.5):
         """
-        Initialise la liste des traders black et white.
+        Initialise les spins des traders black et white.
         :param grid_height: Nombre de lignes de la grille totale.
         :param grid_width: Nombre de colonnes de la grille totale.
         :param init_up: Pourcentage initial de spins -1 (i.e. 'down').
@@ -18,35 +55,36 @@ class SpinSystem:
         self.grid_width = grid_width
         self.init_up = init_up
 
-        # on stocke les traders black et white
+        # on stocke les spins des traders black et white (spins_black, spins_white, int8)
         # chacun a dimension (grid_height x grid_width/2)
         color_width = grid_width // 2
 
-        self.traders_black = []
-        self.traders_white = []
-
-        # Créer et initialiser les traders
+        # tables des voisins, calculées une fois pour toutes (bords périodiques) :
+        # lignes du haut/bas, et colonne du voisin horizontal de chaque case
+        # (black => droite sur les lignes paires, gauche sur les impaires ; white => l'inverse)
+        rows = np.arange(grid_height, dtype=np.int32)
+        self._row_up = np.roll(rows, 1)
+        self._row_dn = np.roll(rows, -1)
+        cols = np.arange(color_width, dtype=np.int32)
+        right_cols = np.roll(cols, -1)
+        left_cols = np.roll(cols, 1)
+        odd_rows = (rows % 2 == 1)[:, None]
+        self._hcols_black = np.where(odd_rows, left_cols, right_cols)
+        self._hcols_white = np.where(odd_rows, right_cols, left_cols)
+
+        # Créer et initialiser les spins des traders
         self._init_traders(color_width)
 
     def _init_traders(self, color_width):
         """
-        Initialise la liste des traders de manière aléatoire (spin +1 ou -1).
+        Initialise les spins des traders de manière aléatoire (spin +1 ou -1).
         """
+        color_shape = (self.grid_height, color_width)
+        # un tirage par trader : -1 si le tirage est < init_up, +1 sinon
         # Grille black
-        for row in range(self.grid_height):
-            for col in range(color_width):
-                # spin par défaut = +1
-                # on met -1 si random() < init_up
-                spin_val = -1 if random() < self.init_up else +1
-                trader = Trader(row=row, col=col, spin=spin_val, is_black=True)
-                self.traders_black.append(trader)
-
+        self.spins_black = np.where(np.random.random(color_shape) < self.init_up, -1, 1).astype(np.int8)
         # Grille white
-        for row in range(self.grid_height):
-            for col in range(color_width):
-                spin_val = -1 if random() < self.init_up else +1
-                trader = Trader(row=row, col=col, spin=spin_val, is_black=False)
-                self.traders_white.append(trader)
+        self.spins_white = np.where(np.random.random(color_shape) < self.init_up, -1, 1).astype(np.int8)
 
     def precompute_probabilities(self, reduced_neighbor_coupling, market_coupling):
         """
@@ -54,74 +92,58 @@ class SpinSystem:
         et sommes de voisins (-4, -2, 0, +2, +4).
         Retourne une matrice 2x5 => [spin_idx][sum_idx].
         """
-        probabilities = np.empty((2, 5), dtype=float)
-        for row in range(2):
-            spin = 1 if row == 1 else -1
-            for col in range(5):
-                neighbour_sum = -4 + 2*col  # -4, -2, 0, 2, 4
-                field = reduced_neighbor_coupling * neighbour_sum - market_coupling * spin
-                probabilities[row, col] = 1 / (1 + np.exp(field))
+        # toute la table en un seul appel à np.exp : spin en ligne, somme des voisins en colonne
+        spins = np.array([-1.0, 1.0])[:, None]  # row=0 => spin=-1, row=1 => spin=+1
+        neighbour_sums = np.arange(-4, 5, 2, dtype=float)[None, :]  # -4, -2, 0, 2, 4
+        field = reduced_neighbor_coupling * neighbour_sums - market_coupling * spins
+        probabilities = 1 / (1 + np.exp(field))
         return probabilities
 
-    def _compute_neighbour_sum(self, trader, all_traders, is_black):
-        """
-        Calcule la somme des spins voisins (4 voisins: haut, bas, soi-même, horizontal).
-        :param trader: l'objet Trader à mettre à jour
-        :param all_traders: liste (black ou white) dans laquelle on cherche
-                            la valeur du spin.
-        :param is_black: bool indiquant si on est en train de mettre à jour black (True) ou white (False).
-        """
-        row, col = trader.row, trader.col
-        grid_height = self.grid_height
-        grid_width = len(all_traders) // grid_height  # color_width
-
-        # bords périodiques
-        lower_neighbor_row = row + 1 if (row + 1 < grid_height) else 0
-        upper_neighbor_row = row - 1
-        right_neighbor_col = col + 1 if (col + 1 < grid_width) else 0
-        left_neighbor_col = col - 1
-
-        # calcul de l'indice horizontal
-        if is_black:
-            # si row est pair => on prend right, sinon left
-            horizontal_neighbor_col = left_neighbor_col if (row % 2) else right_neighbor_col
-        else:
-            # inverse
-            horizontal_neighbor_col = right_neighbor_col if (row % 2) else left_neighbor_col
-
-        # Récupération des spins : haut/bas/soi-même/horizontal
-        # Comme on stocke all_traders dans un tableau 1D, on doit 
-        # convertir (r, c) en index => index = r * color_width + c
-        def idx(r, c):
-            return r * grid_width + c
-
-        spin_up    = all_traders[idx(upper_neighbor_row, col)].spin
-        spin_down  = all_traders[idx(lower_neighbor_row, col)].spin
-        spin_self  = all_traders[idx(row, col)].spin
-        spin_horiz = all_traders[idx(row, horizontal_neighbor_col)].spin
-
-        return spin_up + spin_down + spin_self + spin_horiz
-
     def _update_subgrid(self, subgrid, other_subgrid, probabilities, is_black):
         """
         Met à jour tous les traders de 'subgrid' en se basant sur les spins de 'other_subgrid'.
-        :param subgrid: liste de Trader (black ou white)
-        :param other_subgrid: l'autre liste
+        :param subgrid: tableau des spins (black ou white)
+        :param other_subgrid: l'autre tableau
         :param probabilities: table 2x5 
         :param is_black: bool indiquant si subgrid == black
         """
-        for trader in subgrid:
-            neighbour_sum = self._compute_neighbour_sum(trader, other_subgrid, is_black)
-
-            # spin_idx : 0 => -1, 1 => +1
-            spin_idx = 1 if trader.spin == +1 else 0
-            # sum_idx : (-4 => 0, -2 => 1, 0 => 2, 2 => 3, 4 => 4)
-            sum_idx = int((neighbour_sum + 4) / 2)
-
-            if random() < probabilities[spin_idx, sum_idx]:
-                trader.spin = +1
-            else:
-                trader.spin = -1
+        # un tirage uniforme par trader (générateur global de NumPy)
+        rand = np.random.random(subgrid.shape)
+
+        if NUMBA_AVAILABLE:
+            horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+            _sweep(subgrid, other_subgrid, probabilities, rand,
+                   self._row_up, self._row_dn, horizontal_neighbor_cols)
+            return
+
+        grid_height, grid_width = subgrid.shape
+        horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+        # lignes de la table : spin -1 => probabilities[0], spin +1 => probabilities[1]
+        probs_down = probabilities[0].tolist()
+        probs_up = probabilities[1].tolist()
+        for row in range(grid_height):
+            # tout ce qui ne dépend que de la ligne est lu une fois (listes Python : accès rapides)
+            upper_row = other_subgrid[self._row_up[row]].tolist()
+            lower_row = other_subgrid[self._row_dn[row]].tolist()
+            same_row = other_subgrid[row].tolist()
+            hcols_row = horizontal_neighbor_cols[row].tolist()
+            spins_row = subgrid[row].tolist()
+            rand_row = rand[row].tolist()
+
+            for col in range(grid_width):
+                # voisins haut, bas, soi-même et horizontal
+                neighbour_sum = upper_row[col] + lower_row[col] + same_row[col] + same_row[hcols_row[col]]
+                # sum_idx : (-4 => 0, -2 => 1, 0 => 2, 2 => 3, 4 => 4)
+                sum_idx = (neighbour_sum + 4) >> 1
+                row_probs = probs_up if spins_row[col] == +1 else probs_down
+
+                if rand_row[col] < row_probs[sum_idx]:
+                    spins_row[col] = +1
+                else:
+                    spins_row[col] = -1
+
+            # la ligne ne lit que other_subgrid : on peut la réécrire d'un bloc
+            subgrid[row] = spins_row
 
     def update(self, reduced_neighbour_coupling, reduced_alpha):
         """
@@ -129,9 +151,8 @@ class SpinSystem:
         et renvoie la magnétisation relative.
         """
         # 1) calcul market
-        number_of_traders = len(self.traders_black) + len(self.traders_white)
-        global_market = sum(t.spin for t in self.traders_black) \
-                      + sum(t.spin for t in self.traders_white)
+        number_of_traders = self.spins_black.size + self.spins_white.size
+        global_market = int(self.spins_black.sum(dtype=np.int64) + self.spins_white.sum(dtype=np.int64))
         # magnétisation = global_market / number_of_traders
         market_coupling = reduced_alpha * abs(global_market) / number_of_traders
 
@@ -139,9 +160,9 @@ class SpinSystem:
         probabilities = self.precompute_probabilities(reduced_neighbour_coupling, market_coupling)
 
         # 3) update black (source=black, checkerboard=white)
-        self._update_subgrid(self.traders_black, self.traders_white, probabilities, is_black=True)
+        self._update_subgrid(self.spins_black, self.spins_white, probabilities, is_black=True)
 
         # 4) update white (source=white, checkerboard=black)
-        self._update_subgrid(self.traders_white, self.traders_black, probabilities, is_black=False)
+        self._update_subgrid(self.spins_white, self.spins_black, probabilities, is_black=False)
 
         return global_market / number_of_traders
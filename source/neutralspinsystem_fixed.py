@@ -1,13 +1,66 @@
 import numpy as np
-from random import random
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba est optionnel : on retombe alors sur la version NumPy
+    NUMBA_AVAILABLE = False
+
+# résolution des tirages : entiers uniformes sur 16 bits, comparés à seuil = round(P(flip) * 65536)
+# (ramené dans [1, 65535] si 0 < p < 1 : sinon tout p < 2^-17 ~ 7.6e-6 donnerait 0 et un état absorbant)
+RAND_RESOLUTION = 1 << 16
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True, boundscheck=False, nogil=True)
+    def _sweep_color(source, other, flip_table, rand, row_up, row_dn, hcols):
+        """
+        Met à jour (version compilée) chaque spin (-1/+1) de 'source' en se référant à 'other'.
+        flip_table est la table 2x9 des seuils de flip mise à plat : indice 9 * spin_idx + sum_idx,
+        rand contient un tirage entier uniforme sur 16 bits par case.
+        Les voisins sont lus dans les tables précalculées row_up, row_dn et hcols.
+        Les spins neutres (0) ne changent jamais : toutes les cases sont calculées sans
+        branchement, puis multipliées par spin * spin (0 pour les neutres, 1 sinon).
+        Renvoie la somme des nouveaux spins de 'source'.
+        """
+        grid_height, grid_width = source.shape
+        # copie locale de la table (72 octets) : en cache L1 avant la boucle principale
+        flip_table = flip_table.copy()
+        market = 0
+        for row in prange(grid_height):
+            upper_neighbor_row = row_up[row]
+            lower_neighbor_row = row_dn[row]
+
+            for col in range(grid_width):
+                current_spin = source[row, col]
+
+                neighbour_sum = (
+                    other[upper_neighbor_row, col] +
+                    other[lower_neighbor_row, col] +
+                    other[row, col] +
+                    other[row, hcols[row, col]]
+                )
+                spin_idx = (1 - current_spin) >> 1  # +1 => 0, -1 => 1 (neutre => 0, résultat annulé plus bas)
+                sum_idx = neighbour_sum + 4
+
+                # flip sans branchement : +1 si le tirage est sous le seuil, -1 sinon,
+                # ramené à 0 pour les neutres
+                new_spin = (2 * (rand[row, col] < flip_table[9 * spin_idx + sum_idx]) - 1) \
+                    * current_spin * current_spin
+                source[row, col] = new_spin
+                market += new_spin
+        return market
+
 
 class SpinSystem:
     """
     Classe représentant un système de spins avec mise à jour en damier (checkerboard).
     Possibilité d'ajouter une zone d'agents neutres localisés.
+    Les spins sont stockés en SoA dans des tableaux int8 de forme (H, W//2), séparés en
+    sous-grilles black/white selon la décomposition en damier de Preis et al.
     """
 
-    def __init__(self, grid_height, grid_width, init_up=0.5, fraction_neutral=0.2, region_neutral="random"):
+    def __init__(self, grid_height, grid_width, init_up=0.5, fraction_neutral=0.2, region_neutral="random", seed=None):
         """
         Initialise le système de spins avec des agents pouvant être neutres.
         
@@ -16,6 +69,8 @@ class SpinSystem:
         :param init_up: Pourcentage d'agents initialement à +1
         :param fraction_neutral: Fraction d'agents qui seront toujours neutres (S = 0)
         :param region_neutral: Zone où placer les agents neutres ("random", "top_left", "top_right", "bottom_left", "bottom_right")
+        :param seed: Graine du générateur aléatoire (par défaut tirée du générateur global de NumPy,
+                     pour que np.random.seed(...) garde la simulation reproductible)
         """
         self.grid_height = grid_height
         self.grid_width = grid_width
@@ -23,12 +78,51 @@ class SpinSystem:
         self.fraction_neutral = fraction_neutral
         self.region_neutral = region_neutral
 
+        # générateur aléatoire (PCG64)
+        if seed is None:
+            seed = np.random.randint(2**31)
+        self._rng = np.random.default_rng(seed)
+
         color_shape = (grid_height, grid_width // 2)
         self.black = np.ones(color_shape, dtype=np.int8)
         self.white = np.ones(color_shape, dtype=np.int8)
 
+        # tampons de la version NumPy du sweep (somme des voisins en int8, seuils de flip,
+        # masque et int8 intermédiaires)
+        self._nsum = np.empty(color_shape, dtype=np.int8)
+        self._thresholds_buf = np.empty(color_shape, dtype=np.uint32)
+        self._mask_buf = np.empty(color_shape, dtype=bool)
+        self._int8_buf = np.empty(color_shape, dtype=np.int8)
+
+        # colonnes du voisin horizontal pour chaque case de la sous-grille :
+        # black => droite sur les lignes paires, gauche sur les impaires ; white => l'inverse
+        cols = np.arange(grid_width // 2, dtype=np.int32)
+        right_cols = np.roll(cols, -1)
+        left_cols = np.roll(cols, 1)
+        odd_rows = (np.arange(grid_height) % 2 == 1)[:, None]
+        self._hcols_black = np.where(odd_rows, left_cols, right_cols)
+        self._hcols_white = np.where(odd_rows, right_cols, left_cols)
+
+        # lignes voisines du haut et du bas (périodiques)
+        rows = np.arange(grid_height, dtype=np.int32)
+        self._row_up = np.roll(rows, 1)
+        self._row_dn = np.roll(rows, -1)
+
+        # cache des tables de seuils de flip, indexé par |global_market| (au plus N + 1 entrées),
+        # valable pour le couple (J, alpha) de _prob_cache_couplings et vidé quand il change
+        self._prob_cache = {}
+        self._prob_cache_couplings = None
+
         self._init_spins()
 
+        # magnétisation globale (somme des spins) : calculée une fois ici, puis tenue à jour
+        # par les sweeps qui renvoient la somme de leur couleur
+        self._global_market = int(self.black.sum(dtype=np.int64) + self.white.sum(dtype=np.int64))
+
+        # les sweeps parcourent les lignes avec un pas de 1 : tableaux C-contigus obligatoires
+        for arr in (self.black, self.white, self._hcols_black, self._hcols_white):
+            assert arr.flags['C_CONTIGUOUS']
+
 
     def _init_spins(self):
         """
@@ -43,122 +137,161 @@ class SpinSystem:
 
         if self.region_neutral == "random":
             # selection aleatoire de num_neutral agents dans toute la grille
-            indices = np.random.choice(total_agents, num_neutral, replace=False)
+            # (shuffle=False : pas de permutation complète des total_agents indices)
+            indices = self._rng.choice(total_agents, num_neutral, replace=False, shuffle=False)
             full_grid.ravel()[indices] = 0  # mettre les indices selectionnes à 0
 
         else:
             half_h, half_w = self.grid_height // 2, self.grid_width // 2
 
+            # la zone est une vue (tranches) de full_grid : pas de meshgrid ni d'indices int64
             if self.region_neutral == "top_left":
-                region_x, region_y = np.meshgrid(np.arange(0, half_h), np.arange(0, half_w), indexing='ij')
+                region = full_grid[:half_h, :half_w]
             elif self.region_neutral == "top_right":
-                region_x, region_y = np.meshgrid(np.arange(0, half_h), np.arange(half_w, self.grid_width), indexing='ij')
+                region = full_grid[:half_h, half_w:]
             elif self.region_neutral == "bottom_left":
-                region_x, region_y = np.meshgrid(np.arange(half_h, self.grid_height), np.arange(0, half_w), indexing='ij')
+                region = full_grid[half_h:, :half_w]
             elif self.region_neutral == "bottom_right":
-                region_x, region_y = np.meshgrid(np.arange(half_h, self.grid_height), np.arange(half_w, self.grid_width), indexing='ij')
+                region = full_grid[half_h:, half_w:]
             else:
                 raise ValueError("Erreur: région neutre invalide ! Choisir 'random', 'top_left', 'top_right', 'bottom_left' ou 'bottom_right'.")
 
-            region_indices = np.ravel_multi_index((region_x.ravel(), region_y.ravel()), full_grid.shape)
-
-            num_neutral_in_zone = min(int(self.fraction_neutral * len(region_indices)), len(region_indices))
-            selected_indices = np.random.choice(region_indices, num_neutral_in_zone, replace=False)
+            # selectionner num_neutral_in_zone agents dans cette zone (indices à plat dans la zone)
+            num_neutral_in_zone = min(int(self.fraction_neutral * region.size), region.size)
+            selected_indices = self._rng.choice(region.size, num_neutral_in_zone, replace=False, shuffle=False)
 
-            full_grid.ravel()[selected_indices] = 0
+            region[np.divmod(selected_indices, region.shape[1])] = 0
 
-        # affectation des valeurs restantes à +1 ou -1
-        for i in range(self.grid_height):
-            for j in range(self.grid_width):
-                if full_grid[i, j] == 0:
-                    continue  # deja neutre
-                full_grid[i, j] = 1 if random() < self.init_up else -1
+        # affectation des valeurs restantes à +1 ou -1 (les neutres restent à 0)
+        neutral_mask = full_grid == 0
+        full_grid = np.where(
+            neutral_mask, 0, np.where(self._rng.random(full_grid.shape) < self.init_up, 1, -1)
+        ).astype(np.int8)
 
         self.black[:, :] = full_grid[:, ::2] 
         self.white[:, :] = full_grid[:, 1::2] 
 
+        # masques des agents actifs (non neutres), fixes pendant toute la simulation
+        self._active_black = self.black != 0
+        self._active_white = self.white != 0
+
 
     def precompute_probabilities(self, reduced_neighbor_coupling, market_coupling):
         """
         Calcule les probabilités de flip pour toutes les combinaisons :
-        - 2 états initiaux du spin : (+1 ou -1 ou 0)  
+        - 2 états initiaux du spin : (+1 ou -1), les neutres ne sont jamais mis à jour
         - 9 sommes de voisins possibles : (-4, -3, -2, -1, 0, +1, +2, +3, +4)
         """
-        probabilities = np.empty((3, 9), dtype=float)
-        # spin_idx: 0 => spin = -1, 1 => spin = +1
-        for spin_idx in [0, 1, 2]:
-            spin_val = -1 if spin_idx == 2 else spin_idx
-            for col in range(9):
-                neighbour_sum = -4 + col  # -4, -3, -2, -1, 0, +1, +2, +3, +4
-                field = reduced_neighbor_coupling * neighbour_sum \
-                        - market_coupling * spin_val 
-                probabilities[spin_idx, col] = 1.0 / (1.0 + np.exp(field))
+        # spin_idx: 0 => spin = +1, 1 => spin = -1
+        spin_vals = np.array([1, -1])
+        neighbour_sums = np.arange(-4, 5)  # -4, -3, -2, -1, 0, +1, +2, +3, +4
+        field = reduced_neighbor_coupling * neighbour_sums[None, :] \
+                - market_coupling * spin_vals[:, None]
+        # heat-bath 1 / (1 + exp(field)) sous forme stable (pas de débordement de exp)
+        probabilities = 0.5 * (1.0 - np.tanh(0.5 * field))
         return probabilities
 
-    def _compute_neighbour_sum(self, is_black, source, row, col):
+    def precompute_thresholds(self, reduced_neighbor_coupling, market_coupling):
         """
-        Calcule la somme des spins voisins. 
-        Les spins neutres (0) sont pris tels quels => s'ajoutent à la somme.
+        Seuils entiers de flip : un spin passe à +1 si son tirage (entier uniforme sur 16 bits)
+        est < seuil, soit P(flip) = seuil / 65536. En uint32 pour que p = 1 donne le seuil 65536.
         """
-        grid_height, grid_width = source.shape
-
-        # voisin du bas
-        lower_neighbor_row = (row + 1) if (row + 1 < grid_height) else 0
-        # voisin du haut 
-        upper_neighbor_row = (row - 1) if (row - 1 >= 0) else (grid_height - 1)
-
-        # voisins gauche/droite 
-        right_neighbor_col = (col + 1) if (col + 1 < grid_width) else 0
-        left_neighbor_col  = (col - 1) if (col - 1 >= 0) else (grid_width - 1)
+        probabilities = self.precompute_probabilities(reduced_neighbor_coupling, market_coupling)
+        thresholds = np.maximum(np.rint(probabilities * RAND_RESOLUTION), probabilities > 0)
+        np.minimum(thresholds, RAND_RESOLUTION - (probabilities < 1), out=thresholds)
+        return thresholds.astype(np.uint32)
 
-        if is_black:
-            horizontal_neighbor_col = left_neighbor_col if (row % 2) else right_neighbor_col
-        else:
-            horizontal_neighbor_col = right_neighbor_col if (row % 2) else left_neighbor_col
-
-        neighbour_sum = (
-            source[upper_neighbor_row, col] +
-            source[lower_neighbor_row, col] +
-            source[row, col] +
-            source[row, horizontal_neighbor_col]
-        )
-        return int(neighbour_sum)
-
-    def _update_strategies(self, is_black, source, checkerboard_agents, probabilities):
+    def _compute_neighbour_sum(self, is_black, source):
+        """
+        Calcule la somme des spins voisins de toutes les cases en une fois.
+        Les spins neutres (0) sont pris tels quels => s'ajoutent à la somme.
+        Le résultat est écrit dans le tampon self._nsum.
+        """
+        neighbour_sum = self._nsum
+
+        # voisins du haut et du bas : vues décalées pour l'intérieur, bords via row_up/row_dn (H quelconque)
+        np.add(source[:-2], source[2:], out=neighbour_sum[1:-1])
+        np.add(source[self._row_up[0]], source[self._row_dn[0]], out=neighbour_sum[0])
+        np.add(source[self._row_up[-1]], source[self._row_dn[-1]], out=neighbour_sum[-1])
+
+        # lui-même
+        neighbour_sum += source
+
+        # voisin horizontal : vues décalées d'une colonne, une ligne sur deux (pas de gather)
+        # black => droite sur les lignes paires, gauche sur les impaires ; white => l'inverse
+        right_rows, left_rows = (slice(0, None, 2), slice(1, None, 2)) if is_black \
+            else (slice(1, None, 2), slice(0, None, 2))
+        neighbour_sum[right_rows, :-1] += source[right_rows, 1:]
+        neighbour_sum[right_rows, -1] += source[right_rows, 0]
+        neighbour_sum[left_rows, 1:] += source[left_rows, :-1]
+        neighbour_sum[left_rows, 0] += source[left_rows, -1]
+        return neighbour_sum
+
+    def _update_strategies(self, is_black, source, checkerboard_agents, thresholds):
         """
         Met à jour chaque spin (-1/+1) en se référant à checkerboard_agents.
+        thresholds est la table 2x9 des seuils de flip (voir precompute_thresholds).
         Les spins neutres (0) ne changent jamais.
+        Renvoie la somme des nouveaux spins de source.
         """
-        grid_height, grid_width = source.shape
-        for row in range(grid_height):
-            for col in range(grid_width):
-                current_spin = source[row, col]
-                if current_spin == 0:
-                    continue
-
-                neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents, row, col)
-                spin_idx = 2 if current_spin == -1 else current_spin
-                # sum_idx = index pour (-4, -3, -2, -1, 0, +1, +2, +3, +4)
-                sum_idx = int((neighbour_sum + 4)) 
-
-                # flip
-                if random() < probabilities[spin_idx][sum_idx]:
-                    source[row, col] = +1
-                else:
-                    source[row, col] = -1
+        # un entier uniforme sur 16 bits par case : 4 tirages par mot brut de 64 bits du PCG64
+        n_spins = source.size
+        rand = self._rng.bit_generator.random_raw((n_spins + 3) // 4).view(np.uint16)[:n_spins]
+        rand = rand.reshape(source.shape)
+
+        if NUMBA_AVAILABLE:
+            horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+            return _sweep_color(source, checkerboard_agents, thresholds.ravel(), rand,
+                                self._row_up, self._row_dn, horizontal_neighbor_cols)
+
+        neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents)
+        # index dans la table à plat 9 * spin_idx + sum_idx, calculé en place en int8 :
+        # sum_idx = index pour (-4, -3, -2, -1, 0, +1, +2, +3, +4)
+        # spin_idx = (1 - spin) >> 1 : +1 => 0, -1 => 1 (neutre => 0, remis à 0 plus bas)
+        flat_idx = neighbour_sum
+        flat_idx += 4
+        spin_idx = np.subtract(1, source, out=self._int8_buf)
+        spin_idx >>= 1
+        spin_idx *= 9
+        flat_idx += spin_idx
+
+        # flip
+        flip_thresholds = np.take(thresholds.ravel(), flat_idx, out=self._thresholds_buf)
+        active = self._active_black if is_black else self._active_white
+        flips_up = np.less(rand, flip_thresholds, out=self._mask_buf)
+        flips_up &= active
+
+        # spins écrits en place en int8 : 2 * up - active donne +1 / -1, et 0 pour les neutres ;
+        # la somme se déduit du nombre de +1 et du nombre d'agents actifs
+        np.multiply(flips_up.view(np.int8), 2, out=source)
+        source -= active.view(np.int8)
+        return 2 * int(np.count_nonzero(flips_up)) - int(np.count_nonzero(active))
 
     def update(self, reduced_neighbour_coupling, reduced_alpha, excluding_neutrals=False):
         """
         Met à jour les spins en excluant les neutres.
         """
         number_of_traders = 2 * self.black.shape[0] * self.black.shape[1] #
-        global_market = np.sum(self.black + self.white)
-
-        market_coupling = reduced_alpha * abs(global_market) / number_of_traders
-        probabilities = self.precompute_probabilities(reduced_neighbour_coupling, market_coupling)
-
-        self._update_strategies(True,  self.black, self.white, probabilities)
-        self._update_strategies(False, self.white, self.black, probabilities)
+        # somme des spins, tenue à jour par les sweeps (aucune réduction sur la grille)
+        global_market = self._global_market
+
+        # seuils de flip en cache, indexés par |global_market| (entier borné) ; le cache est
+        # vidé quand les couplages changent
+        couplings = (float(reduced_neighbour_coupling), float(reduced_alpha))
+        if couplings != self._prob_cache_couplings:
+            self._prob_cache.clear()
+            self._prob_cache_couplings = couplings
+        key = abs(global_market)
+        thresholds = self._prob_cache.get(key)
+        if thresholds is None:
+            market_coupling = reduced_alpha * abs(global_market) / number_of_traders
+            thresholds = self.precompute_thresholds(reduced_neighbour_coupling, market_coupling)
+            thresholds.flags.writeable = False  # table partagée entre les sweeps
+            self._prob_cache[key] = thresholds
+
+        black_market = self._update_strategies(True,  self.black, self.white, thresholds)
+        white_market = self._update_strategies(False, self.white, self.black, thresholds)
+        self._global_market = black_market + white_market
 
         if not excluding_neutrals:
             return global_market / number_of_traders
@@ -1,132 +1,493 @@
 import numpy as np
-from random import random
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba est optionnel : on retombe alors sur la version NumPy
+    NUMBA_AVAILABLE = False
+
+try:
+    import cupy as cp
+    from numba import cuda
+    from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float32
+    CUDA_AVAILABLE = cuda.is_available()
+except ImportError:  # cupy et numba.cuda sont optionnels : nécessaires seulement pour backend="cuda"
+    CUDA_AVAILABLE = False
+
+# Taille (x, y) des blocs de threads du kernel GPU (un thread par spin, x le long des colonnes)
+CUDA_BLOCK_SHAPE = (16, 16)
+
+# Résolution des tirages aléatoires : entiers uniformes sur 16 bits (0..65535), comparés
+# à des seuils entiers seuil = round(P(flip) * 65536). L'arrondi enverrait tout p < 2^-17
+# (~7.6e-6) sur 0 et tout p > 1 - 2^-17 sur 65536, rendant certains états absorbants :
+# les seuils sont donc ramenés dans [1, 65535] dès que 0 < p < 1
+RAND_RESOLUTION = 1 << 16
+
+# Taille maximale (en octets) des tirages préparés d'un coup par run_sweeps
+RUN_SWEEPS_RAND_BYTES = 1 << 26
+
+
+def _flip_probabilities(field):
+    """
+    Règle de Heatbath pour un champ local (scalaire ou tableau) : P(flip) = 1 / (1 + exp(field)),
+    écrite 0.5 * (1 - tanh(field / 2)) pour rester stable (pas de débordement de exp)
+    quand |field| est grand.
+    """
+    return 0.5 * (1 - np.tanh(0.5 * field))
+
+
+def _flip_thresholds(field):
+    """
+    Seuils de flip entiers pour un champ local : seuil = round(P(flip) * 65536), ramené dans
+    [1, 65535] si 0 < P(flip) < 1 (voir RAND_RESOLUTION).
+    Seule conversion champ -> seuil, partagée par precompute_thresholds et _run_sweeps.
+    """
+    probability = _flip_probabilities(field)
+    threshold = np.maximum(np.rint(probability * RAND_RESOLUTION), 1.0 * (probability > 0))
+    return np.minimum(threshold, RAND_RESOLUTION - 1.0 * (probability < 1))
+
+
+if NUMBA_AVAILABLE:
+    _flip_probabilities = njit(cache=True, nogil=True)(_flip_probabilities)
+    _flip_thresholds = njit(cache=True, nogil=True)(_flip_thresholds)
+
+    @njit(parallel=True, fastmath=True, cache=True, boundscheck=False, nogil=True)
+    def _sweep_color(source, other, flip_tables, rand, row_up, row_dn, hcols):
+        """
+        Met à jour (version compilée) tous les spins de 'source' en se basant sur la grille 'other'.
+        source, other et rand sont de forme (R, H, W//2) : R répliques indépendantes du système
+        (R = 1 pour un système simple), mises à jour à la suite dans le même appel.
+        flip_tables contient, pour chaque réplique, la table 2x5 des seuils de flip mise à plat :
+        indice 5 * spin_bit + up_count ; rand un tirage entier uniforme sur 16 bits par spin.
+        Les voisins sont lus dans les tables précalculées row_up, row_dn et hcols.
+        Les lignes ne lisent que 'other', elles sont donc indépendantes et parcourues en parallèle.
+        Renvoie la somme des nouveaux spins de chaque réplique (calculée pendant la mise à jour).
+        Le GIL est relâché (nogil).
+        """
+        n_replicas, grid_height, grid_width = source.shape
+        # Copie locale des tables (40 octets par réplique) : en cache L1 avant la boucle principale
+        flip_tables = flip_tables.copy()
+        market = np.empty(n_replicas, dtype=np.int64)
+        for replica in range(n_replicas):
+            replica_source = source[replica]
+            replica_other = other[replica]
+            replica_rand = rand[replica]
+            flip_table = flip_tables[replica]
+            replica_market = 0
+            for row in prange(grid_height):
+                upper_neighbor_row = row_up[row]
+                lower_neighbor_row = row_dn[row]
+
+                for col in range(grid_width):
+                    # Bit du spin (-1 -> 0, +1 -> 1) et nombre de voisins "up" (0..4)
+                    spin_bit = (replica_source[row, col] + 1) >> 1
+                    up_count = (
+                        replica_other[upper_neighbor_row, col]
+                        + replica_other[lower_neighbor_row, col]
+                        + replica_other[row, col]
+                        + replica_other[row, hcols[row, col]]
+                        + 4
+                    ) >> 1
+
+                    # Flip sans branchement : +1 si le tirage est sous le seuil, -1 sinon
+                    new_spin = 2 * (replica_rand[row, col] < flip_table[5 * spin_bit + up_count]) - 1
+                    replica_source[row, col] = new_spin
+                    replica_market += new_spin
+            market[replica] = replica_market
+        return market
+
+    @njit(cache=True, nogil=True)
+    def _run_sweeps(black, white, reduced_neighbour_coupling, reduced_alpha, global_market,
+                    rand, row_up, row_dn, hcols_black, hcols_white, magnetizations):
+        """
+        Enchaîne rand.shape[0] mises à jour complètes (black puis white) dans un seul appel compilé.
+        black et white sont de forme (R, H, W//2), rand de forme (n_steps, 2, R, H, W//2)
+        (tirages de black puis de white à chaque pas), les couplages de longueur R.
+        Les seuils de flip sont recalculés à chaque pas par _flip_thresholds, comme dans
+        precompute_thresholds ;
+        global_market est tenu à jour en place et magnetizations (n_steps, R) reçoit la
+        magnétisation relative avant chaque pas (la valeur que renverrait update).
+        """
+        n_steps = rand.shape[0]
+        n_replicas = black.shape[0]
+        number_of_traders = 2 * black.shape[1] * black.shape[2]
+        spins = np.array([-1.0, 1.0])
+        neighbour_sums = np.array([-4.0, -2.0, 0.0, 2.0, 4.0])
+        flip_tables = np.empty((n_replicas, 10), dtype=np.uint32)
+        for step in range(n_steps):
+            for replica in range(n_replicas):
+                magnetizations[step, replica] = global_market[replica] / number_of_traders
+                market_coupling = reduced_alpha[replica] * abs(global_market[replica]) / number_of_traders
+                for spin_bit in range(2):
+                    for sum_idx in range(5):
+                        field = reduced_neighbour_coupling[replica] * neighbour_sums[sum_idx] \
+                            - market_coupling * spins[spin_bit]
+                        flip_tables[replica, 5 * spin_bit + sum_idx] = _flip_thresholds(field)
+
+            black_market = _sweep_color(black, white, flip_tables, rand[step, 0],
+                                        row_up, row_dn, hcols_black)
+            white_market = _sweep_color(white, black, flip_tables, rand[step, 1],
+                                        row_up, row_dn, hcols_white)
+            global_market[:] = black_market + white_market
+
+
+if CUDA_AVAILABLE:
+    @cuda.jit
+    def _sweep_color_cuda(source, other, flip_table, rng_states, row_up, row_dn, hcols):
+        """
+        Met à jour (version GPU) les spins de 'source' en se basant sur la grille 'other' :
+        chaque thread traite une case (row, col) de la sous-grille.
+        Mêmes tables que _sweep_color (row_up, row_dn, hcols), mais flip_table contient les
+        probabilités de flip, et chaque thread tire son nombre uniforme dans son propre
+        état xoroshiro128+ (rng_states, un état par case).
+        """
+        col, row = cuda.grid(2)  # x le long des colonnes (axe contigu), y le long des lignes
+        grid_height, grid_width = source.shape
+        if row < grid_height and col < grid_width:
+            # État d'indice row * W + col : des threads consécutifs en x (col) lisent des
+            # états consécutifs en mémoire
+            rand = xoroshiro128p_uniform_float32(rng_states, row * grid_width + col)
+            spin_bit = (source[row, col] + 1) >> 1
+            up_count = (
+                other[row_up[row], col]
+                + other[row_dn[row], col]
+                + other[row, col]
+                + other[row, hcols[row, col]]
+                + 4
+            ) >> 1
+
+            if rand < flip_table[5 * spin_bit + up_count]:
+                source[row, col] = 1
+            else:
+                source[row, col] = -1
+
 
 class SpinSystem:
     """
     Classe représentant un système de spins avec mise à jour en damier (checkerboard).
+    Les spins sont stockés en SoA dans des tableaux int8 de forme (H, W//2), séparés en
+    sous-grilles black/white selon la décomposition en damier de Preis et al.
+    Avec n_replicas = R, black et white sont de forme (R, H, W//2) : R systèmes indépendants
+    (par exemple R couples (beta, alpha)) mis à jour ensemble à chaque sweep.
+    Plusieurs systèmes peuvent tourner dans des threads Python si la couche de threads Numba
+    est 'omp' ou 'tbb' (la couche 'workqueue' fait avorter le processus).
     """
 
-    def __init__(self, grid_height, grid_width, init_up=0.5):
+    def __init__(self, grid_height, grid_width, init_up=0.5, seed=None, backend="cpu", n_replicas=None):
         """
         Initialise la grille (black, white) avec un pourcentage init_up de spins "down" (-1).
+        seed est la graine du générateur aléatoire ; par défaut elle est tirée du générateur
+        global de NumPy, de sorte que np.random.seed(...) rend la simulation reproductible.
+        backend vaut "cpu" (Numba ou NumPy) ou "cuda" : black et white sont alors des
+        cupy.ndarray gardés sur le GPU (utiliser .get() pour les ramener sur l'hôte).
+        n_replicas (backend "cpu" seulement) ajoute un axe de répliques en tête de black/white ;
+        update renvoie alors un tableau de R magnétisations.
         """
+        if backend not in ("cpu", "cuda"):
+            raise ValueError("Erreur: backend invalide ! Choisir 'cpu' ou 'cuda'.")
+        if backend == "cuda" and not CUDA_AVAILABLE:
+            raise RuntimeError("Erreur: le backend 'cuda' nécessite cupy, numba.cuda et un GPU.")
+        if backend == "cuda" and n_replicas is not None:
+            raise ValueError("Erreur: n_replicas n'est disponible qu'avec le backend 'cpu'.")
+        self.backend = backend
+        self.n_replicas = n_replicas
+
         self.grid_height = grid_height
         self.grid_width = grid_width
         self.init_up = init_up  # Pourcentage de spins initiaux orientés "down"
 
+        # Générateur aléatoire (PCG64)
+        if seed is None:
+            seed = np.random.randint(2**31)
+        self._rng = np.random.default_rng(seed)
+
         # Initialisation des deux sous-matrices black et white
         # On conserve l'idée de color_shape pour stocker la moitié du nombre de colonnes
+        # (précédée de l'axe des répliques si n_replicas est donné)
         color_shape = (grid_height, grid_width // 2)
+        if n_replicas is not None:
+            color_shape = (n_replicas,) + color_shape
         self.black = np.ones(color_shape, dtype=np.byte)
         self.white = np.ones(color_shape, dtype=np.byte)
 
+        # Tampons de la version NumPy du sweep : somme des voisins (|somme| <= 4, tient
+        # dans un int8), seuil de flip de chaque case, masque booléen et int8 intermédiaires
+        self._nsum = np.empty(color_shape, dtype=np.int8)
+        self._thresholds_buf = np.empty(color_shape, dtype=np.uint32)
+        self._mask_buf = np.empty(color_shape, dtype=bool)
+        self._int8_buf = np.empty(color_shape, dtype=np.int8)
+
+        # Lignes voisines haut/bas (bords périodiques)
+        rows = np.arange(grid_height, dtype=np.int32)
+        self._row_up = np.roll(rows, 1)   # row - 1
+        self._row_dn = np.roll(rows, -1)  # row + 1
+
+        # Colonnes du voisin horizontal (dans l'autre sous-grille) pour chaque case :
+        # black => voisin de droite sur les lignes paires, de gauche sur les impaires,
+        # white => l'inverse.
+        cols = np.arange(grid_width // 2, dtype=np.int32)
+        right_cols = np.roll(cols, -1)  # col + 1 (bord périodique)
+        left_cols = np.roll(cols, 1)    # col - 1 (bord périodique)
+        odd_rows = (rows % 2 == 1)[:, None]
+        self._hcols_black = np.where(odd_rows, left_cols, right_cols)
+        self._hcols_white = np.where(odd_rows, right_cols, left_cols)
+
+        # Cache des tables de seuils de flip, indexé par |global_market| (au plus N + 1 entrées),
+        # valable pour le couple (J, alpha) de _prob_cache_couplings et vidé quand il change
+        self._prob_cache = {}
+        self._prob_cache_couplings = None
+
         self._init_spins()
 
+        # Magnétisation globale (somme des spins) : calculée une seule fois ici, puis tenue
+        # à jour par les sweeps, qui renvoient la somme de leur couleur (même passage mémoire) ;
+        # un entier par réplique si n_replicas est donné
+        global_market = self.black.sum(axis=(-2, -1), dtype=np.int64) \
+            + self.white.sum(axis=(-2, -1), dtype=np.int64)
+        self._global_market = int(global_market) if n_replicas is None else global_market
+
+        # Les sweeps lisent les lignes avec un pas de 1 : tous les tableaux qui leur sont
+        # passés doivent être C-contigus (les mises à jour se font en place, source[:] = ...)
+        for arr in (self.black, self.white, self._hcols_black, self._hcols_white):
+            assert arr.flags['C_CONTIGUOUS']
+
+        if backend == "cuda":
+            # Spins et tables de voisins copiés une fois pour toutes sur le GPU ;
+            # chaque thread garde son propre état aléatoire (xoroshiro128+) sur le GPU
+            self.black = cp.asarray(self.black)
+            self.white = cp.asarray(self.white)
+            self._row_up = cp.asarray(self._row_up)
+            self._row_dn = cp.asarray(self._row_dn)
+            self._hcols_black = cp.asarray(self._hcols_black)
+            self._hcols_white = cp.asarray(self._hcols_white)
+            self._rng_states = create_xoroshiro128p_states(
+                color_shape[0] * color_shape[1], seed=int(self._rng.integers(2**31))
+            )
+            # Grille (x, y) = (colonnes, lignes) : les threads voisins en x lisent des
+            # colonnes contiguës
+            self._cuda_blocks = tuple(
+                -(-size // block) for size, block in zip(color_shape[::-1], CUDA_BLOCK_SHAPE)
+            )
+
     def _init_spins(self):
         """
         Initialise aléatoirement les spins dans black et white :
         +1 = spin "up", -1 = spin "down".
         """
         for color_arr in (self.black, self.white):
-            rows, cols = color_arr.shape
-            for row in range(rows):
-                for col in range(cols):
-                    # Si random() < init_up, on met le spin à -1 ("down"),
-                    # sinon il reste +1 ("up").
-                    if random() < self.init_up:
-                        color_arr[row, col] = -1
+            # Un tirage par spin : s'il est < init_up, le spin vaut -1 ("down"),
+            # sinon +1 ("up").
+            color_arr[:] = np.where(self._rng.random(color_arr.shape) < self.init_up, -1, 1)
 
-    def precompute_probabilities(self, reduced_neighbor_coupling, market_coupling):
+    def _local_fields(self, reduced_neighbor_coupling, market_coupling):
         """
-        Calcule les probabilités de flip pour toutes les combinaisons :
+        Champ local (equation (4)) pour toutes les combinaisons :
         - 2 états initiaux du spin : (+1 ou -1)
         - 5 sommes de voisins possibles : (-4, -2, 0, +2, +4)
+        Les couplages peuvent être des tableaux de longueur R : on obtient alors une table 2x5
+        par réplique, de forme (R, 2, 5).
+        """
+        # row=0 => spin=-1, row=1 => spin=+1
+        spins = np.array([-1, 1])
+        neighbour_sums = np.arange(-4, 5, 2)  # -4, -2, 0, +2, +4
+        reduced_neighbor_coupling = np.asarray(reduced_neighbor_coupling, dtype=np.float64)[..., None, None]
+        market_coupling = np.asarray(market_coupling, dtype=np.float64)[..., None, None]
+        return reduced_neighbor_coupling * neighbour_sums[None, :] \
+                - market_coupling * spins[:, None] #equation (4)
+
+    def precompute_probabilities(self, reduced_neighbor_coupling, market_coupling):
+        """
+        Calcule les probabilités de flip (règle de Heatbath) pour toutes les combinaisons
+        (spin, somme des voisins) : table 2x5, ou (R, 2, 5) avec des couplages de longueur R.
         """
-        probabilities = np.empty((2, 5), dtype=float)
-        for row in range(2):
-            # row=0 => spin=-1, row=1 => spin=+1
-            spin = 1 if row else -1
-            for col in range(5):
-                neighbour_sum = -4 + 2*col  # -4, -2, 0, +2, +4
-                field = reduced_neighbor_coupling * neighbour_sum \
-                        - market_coupling * spin #equation (4)
-                # Règle de Heatbath : P(flip) = 1 / (1 + exp(field))
-                probabilities[row, col] = 1 / (1 + np.exp(field))
-        return probabilities
-
-    def _compute_neighbour_sum(self, is_black, source, row, col):
-        """
-        Calcule la somme des spins voisins selon la mise à jour en damier.
+        return _flip_probabilities(self._local_fields(reduced_neighbor_coupling, market_coupling))
+
+    def precompute_thresholds(self, reduced_neighbor_coupling, market_coupling):
+        """
+        Table des seuils de flip entiers :
+        un spin passe à +1 si son tirage (entier uniforme sur 16 bits) est < seuil,
+        soit P(flip) = seuil / 65536 (à 7.6e-6 près, seuil dans [1, 65535] si 0 < p < 1).
+        Les seuils sont en uint32 pour que p = 1 (seuil 65536) donne toujours +1.
+        """
+        fields = self._local_fields(reduced_neighbor_coupling, market_coupling)
+        return _flip_thresholds(fields).astype(np.uint32)
+
+    def _compute_neighbour_sum(self, is_black, source):
+        """
+        Calcule la somme des spins voisins de toutes les cases à la fois, selon la mise à jour en damier.
         - is_black indique si on met à jour la grille "black".
-        - source est l'autre grille (voisins).
+        - source est l'autre grille (voisins), de forme (R, H, W//2).
+        Le résultat est écrit dans le tampon self._nsum (réutilisé d'un sweep à l'autre).
         """
-        grid_height, grid_width = source.shape
+        neighbour_sum = self._nsum.reshape(source.shape)
 
-        # Voisins haut/bas (avec bords périodiques)
-        lower_neighbor_row = row + 1 if (row + 1 < grid_height) else 0
-        upper_neighbor_row = row - 1
+        # Haut + bas : vues décalées (sans copie) pour les lignes intérieures,
+        # puis les deux lignes de bord, lues dans les tables périodiques (valable même si H < 3)
+        np.add(source[:, :-2], source[:, 2:], out=neighbour_sum[:, 1:-1])
+        np.add(source[:, self._row_up[0]], source[:, self._row_dn[0]], out=neighbour_sum[:, 0])
+        np.add(source[:, self._row_up[-1]], source[:, self._row_dn[-1]], out=neighbour_sum[:, -1])
 
-        # Voisins gauche/droite (avec bords périodiques)
-        right_neighbor_col = col + 1 if (col + 1 < grid_width) else 0
-        left_neighbor_col = col - 1
+        # + lui-même
+        neighbour_sum += source
 
-        # Détermine le voisin horizontal en fonction de la parité de row
-        if is_black:
-            horizontal_neighbor_col = left_neighbor_col if (row % 2) else right_neighbor_col
-        else:
-            horizontal_neighbor_col = right_neighbor_col if (row % 2) else left_neighbor_col
-
-        # Somme des spins : haut + bas + lui-même + voisin horizontal
-        neighbour_sum = (
-            source[upper_neighbor_row, col]
-            + source[lower_neighbor_row, col]
-            + source[row, col]
-            + source[row, horizontal_neighbor_col]
-        )
-        return int(neighbour_sum)
+        # + voisin horizontal : vues décalées d'une colonne, une ligne sur deux (sans gather).
+        # black => droite sur les lignes paires, gauche sur les impaires ; white => l'inverse
+        right_rows, left_rows = (slice(0, None, 2), slice(1, None, 2)) if is_black \
+            else (slice(1, None, 2), slice(0, None, 2))
+        neighbour_sum[:, right_rows, :-1] += source[:, right_rows, 1:]
+        neighbour_sum[:, right_rows, -1] += source[:, right_rows, 0]
+        neighbour_sum[:, left_rows, 1:] += source[:, left_rows, :-1]
+        neighbour_sum[:, left_rows, 0] += source[:, left_rows, -1]
+        return neighbour_sum
 
-    def _update_strategies(self, is_black, source, checkerboard_agents, probabilities):
+    def _update_strategies(self, is_black, source, checkerboard_agents, thresholds):
         """
         Met à jour tous les spins de 'source' (black ou white) en se basant sur la grille 'checkerboard_agents'.
+        thresholds est la table 2x5 des seuils de flip (voir precompute_thresholds),
+        ou (R, 2, 5) avec une table par réplique.
+        Renvoie la somme des nouveaux spins de 'source' (un tableau de R sommes avec n_replicas).
         """
-        grid_height, grid_width = source.shape
+        if self.backend == "cuda":
+            return self._update_strategies_cuda(is_black, source, checkerboard_agents, thresholds)
 
-        for row in range(grid_height):
-            for col in range(grid_width):
-                neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents, row, col)
+        # Vues (R, H, W//2) sans copie : R = 1 pour un système sans répliques
+        replicas_shape = (-1,) + source.shape[-2:]
+        source = source.reshape(replicas_shape)
+        checkerboard_agents = checkerboard_agents.reshape(replicas_shape)
+        flip_tables = thresholds.reshape(-1, 10)
 
-                # Convertit le spin (-1 ou +1) en index (0 ou 1)
-                spin_idx = int((source[row, col] + 1) / 2)  # -1 -> 0, +1 -> 1
-                # Convertit la somme des voisins (-4,-2,0,2,4) en index (0..4)
-                sum_idx = int((neighbour_sum + 4) / 2)
+        # Tire un entier uniforme sur 16 bits par spin pour décider s'il bascule :
+        # chaque mot brut de 64 bits du PCG64 est découpé en 4 tirages de 16 bits
+        # (pas de mise à l'échelle comme dans integers(), deux fois plus rapide)
+        n_spins = source.size
+        rand = self._rng.bit_generator.random_raw((n_spins + 3) // 4).view(np.uint16)[:n_spins]
+        rand = rand.reshape(source.shape)
 
-                # Tire un nombre aléatoire pour décider si le spin bascule
-                if random() < probabilities[spin_idx][sum_idx]:
-                    source[row, col] = 1
-                else:
-                    source[row, col] = -1
+        if NUMBA_AVAILABLE:
+            horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+            market = _sweep_color(source, checkerboard_agents, flip_tables, rand,
+                                  self._row_up, self._row_dn, horizontal_neighbor_cols)
+            return market if self.n_replicas is not None else int(market[0])
+
+        neighbour_sum = self._compute_neighbour_sum(is_black, checkerboard_agents)
+
+        # Index calculés en place dans le tampon int8 (jamais élargis en int64) :
+        # somme des voisins (-4,-2,0,2,4) => index (0..4), puis index dans la table à plat
+        # 5 * spin_bit + sum_idx (spin -1 => 0, +1 => 1)
+        flat_idx = neighbour_sum
+        flat_idx += 4
+        flat_idx >>= 1
+        mask_buf = self._mask_buf.reshape(source.shape)
+        spin_bit = np.greater(source, 0, out=mask_buf).view(np.int8)
+        flat_idx += np.multiply(spin_bit, 5, out=self._int8_buf.reshape(source.shape))
+
+        # une table par réplique
+        flip_thresholds = self._thresholds_buf.reshape(source.shape)
+        for replica, flip_table in enumerate(flip_tables):
+            np.take(flip_table, flat_idx[replica], out=flip_thresholds[replica])
+        flips_up = np.less(rand, flip_thresholds, out=mask_buf)
+
+        # spins écrits en place en int8 (2 * up - 1), et somme déduite du nombre de +1 :
+        # pas de tableau temporaire int64 ni de seconde réduction sur source
+        np.multiply(flips_up.view(np.int8), 2, out=source)
+        source -= 1
+        # (count_nonzero sur chaque réplique : avec axis=, NumPy repasse par une somme int64)
+        n_up = np.array([np.count_nonzero(replica_flips) for replica_flips in flips_up])
+        market = 2 * n_up - source[0].size
+        return market if self.n_replicas is not None else int(market[0])
+
+    def _update_strategies_cuda(self, is_black, source, checkerboard_agents, thresholds):
+        """
+        Version GPU de _update_strategies : les tirages (dans le kernel) et la mise à jour
+        restent sur le GPU, seule la somme des nouveaux spins de 'source' est ramenée sur l'hôte.
+        """
+        # mêmes probabilités que les seuils entiers du CPU (seuil / 65536)
+        flip_table = cp.asarray(thresholds.ravel() / RAND_RESOLUTION, dtype=cp.float32)
+        horizontal_neighbor_cols = self._hcols_black if is_black else self._hcols_white
+
+        _sweep_color_cuda[self._cuda_blocks, CUDA_BLOCK_SHAPE](
+            source, checkerboard_agents, flip_table, self._rng_states,
+            self._row_up, self._row_dn, horizontal_neighbor_cols
+        )
+        return int(cp.sum(source, dtype=cp.int64).get())
 
     def update(self, reduced_neighbour_coupling, reduced_alpha):
         """
         Met à jour l'ensemble du système (black puis white),
         calcule la magnétisation relative et la renvoie.
         """
-        # Nombre total de spins
-        number_of_traders = 2 * self.black.shape[0] * self.black.shape[1]
+        # Nombre total de spins (par réplique)
+        number_of_traders = 2 * self.black.shape[-2] * self.black.shape[-1]
 
-        # Calcul de la magnétisation globale
-        global_market = np.sum(self.black + self.white)
+        # Magnétisation globale tenue à jour par les sweeps (aucune réduction sur la grille)
+        global_market = self._global_market
 
-        # Calcul de l'effet du marché
-        market_coupling = reduced_alpha * np.abs(global_market) / number_of_traders
-
-        # Précalcul des probabilités de flip
-        probabilities = self.precompute_probabilities(reduced_neighbour_coupling, market_coupling)
+        if self.n_replicas is not None:
+            # Répliques : couplages scalaires ou de longueur R, une table de seuils par réplique
+            market_coupling = np.asarray(reduced_alpha) * np.abs(global_market) / number_of_traders
+            thresholds = self.precompute_thresholds(reduced_neighbour_coupling, market_coupling)
+        else:
+            # Seuils de flip : la table ne dépend que des couplages et de |global_market|
+            # (entier borné par number_of_traders), elle est donc calculée une seule fois par
+            # valeur ; le cache est vidé quand (J, alpha) change
+            couplings = (float(reduced_neighbour_coupling), float(reduced_alpha))
+            if couplings != self._prob_cache_couplings:
+                self._prob_cache.clear()
+                self._prob_cache_couplings = couplings
+            key = abs(global_market)
+            thresholds = self._prob_cache.get(key)
+            if thresholds is None:
+                # Calcul de l'effet du marché
+                market_coupling = reduced_alpha * np.abs(global_market) / number_of_traders
+                thresholds = self.precompute_thresholds(reduced_neighbour_coupling, market_coupling)
+                thresholds.flags.writeable = False  # table partagée entre les sweeps
+                self._prob_cache[key] = thresholds
 
         # Mise à jour d'abord des spins "black" (en se référant à "white"),
         # puis des spins "white" (en se référant à "black").
-        self._update_strategies(True,  self.black, self.white, probabilities)
-        self._update_strategies(False, self.white, self.black, probabilities)
+        black_market = self._update_strategies(True,  self.black, self.white, thresholds)
+        white_market = self._update_strategies(False, self.white, self.black, thresholds)
+        self._global_market = black_market + white_market
 
-        # Retourne la magnétisation relative
+        # Retourne la magnétisation relative (une par réplique avec n_replicas)
         return global_market / number_of_traders
+
+    def run_sweeps(self, n_steps, reduced_neighbour_coupling, reduced_alpha):
+        """
+        Équivalent de n_steps appels successifs à update : renvoie le tableau des n_steps
+        magnétisations relatives (de forme (n_steps, R) avec n_replicas).
+        Avec Numba, la boucle sur les pas tourne dans un seul appel compilé (_run_sweeps),
+        sans repasser par Python entre deux sweeps ; les tirages sont préparés par blocs de pas.
+        """
+        if not NUMBA_AVAILABLE or self.backend == "cuda":
+            return np.array([self.update(reduced_neighbour_coupling, reduced_alpha)
+                             for _ in range(n_steps)])
+
+        # Vues (R, H, W//2) et couplages de longueur R (R = 1 sans répliques)
+        replicas_shape = (-1,) + self.black.shape[-2:]
+        black = self.black.reshape(replicas_shape)
+        white = self.white.reshape(replicas_shape)
+        n_replicas = black.shape[0]
+        reduced_neighbour_coupling = np.ascontiguousarray(
+            np.broadcast_to(reduced_neighbour_coupling, (n_replicas,)), dtype=np.float64)
+        reduced_alpha = np.ascontiguousarray(
+            np.broadcast_to(reduced_alpha, (n_replicas,)), dtype=np.float64)
+        global_market = np.array(self._global_market, dtype=np.int64).reshape(n_replicas)
+        magnetizations = np.empty((n_steps, n_replicas))
+
+        # Mêmes tirages que update : (n_spins + 3) // 4 mots de 64 bits par couleur et par pas
+        n_spins = black.size
+        n_words = (n_spins + 3) // 4
+        steps_per_block = max(1, RUN_SWEEPS_RAND_BYTES // (2 * 8 * n_words))
+        for first_step in range(0, n_steps, steps_per_block):
+            block_steps = min(steps_per_block, n_steps - first_step)
+            rand = self._rng.bit_generator.random_raw(block_steps * 2 * n_words).view(np.uint16)
+            rand = rand.reshape(block_steps, 2, 4 * n_words)[:, :, :n_spins]
+            rand = rand.reshape((block_steps, 2) + black.shape)
+
+            _run_sweeps(black, white, reduced_neighbour_coupling, reduced_alpha, global_market,
+                        rand, self._row_up, self._row_dn, self._hcols_black, self._hcols_white,
+                        magnetizations[first_step:first_step + block_steps])
+
+        self._global_market = global_market if self.n_replicas is not None else int(global_market[0])
+        return magnetizations if self.n_replicas is not None else magnetizations[:, 0]
@@ -14,24 +14,28 @@ def read_config_file(filename):
             config[key.strip()] = value.strip()
     return config
 
-def reconstruct_grid(black, white):
+def reconstruct_grid(black, white, out=None):
     """
     Rebuild complet grid from sub-matrices black and white.
 
     :param black: black spin array 
     :param white: white spin array
+    :param out: optional C-contiguous (rows, 2 * cols) array to fill, reused between calls
     :return: full grid
     """
     # dimensions
     rows, cols_half = black.shape
-    cols = cols_half * 2  
-    
-    full_grid = np.zeros((rows, cols), dtype=np.byte)
-    
-    full_grid[:, ::2] = black 
-    full_grid[:, 1::2] = white
+    cols = cols_half * 2
+
+    # black in even columns, white in odd columns: interleave along a last axis of size 2,
+    # written once and contiguously (no zero-fill)
+    if out is None:
+        return np.stack((black, white), axis=2).reshape(rows, cols).astype(np.byte, copy=False)
 
-    return full_grid
+    if out.shape != (rows, cols) or not out.flags['C_CONTIGUOUS']:
+        raise ValueError("out must be a C-contiguous array of shape (rows, 2 * cols_half)")
+    np.stack((black, white), axis=2, out=out.reshape(rows, cols_half, 2))
+    return out
 
 
 def visualize_grid(grid, title='Grid visualization'):